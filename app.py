@@ -9,11 +9,13 @@ import signal
 import sys
 import secrets
 import logging
-from collections import deque
 
 import numpy as np
+import scipy.fft
+import scipy.signal
 import sounddevice as sd
 import librosa
+import numba
 import gevent
 from gevent.lock import RLock
 from gevent.event import Event
@@ -22,6 +24,18 @@ from time import time as get_time
 from flask import Flask, render_template, request
 from flask_socketio import SocketIO, emit
 
+try:
+    # Optional: records in a C callback, so no Python runs on the audio thread
+    import rtmixer
+except ImportError:
+    rtmixer = None
+
+try:
+    # Optional: faster JSON encoding of Socket.IO packets
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,10 +44,27 @@ app = Flask(__name__)
 # Issue #1: Use secure secret key from environment or generate one
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', secrets.token_hex(32))
 
+
+class OrjsonJSON:
+    """
+    json module interface over orjson for Socket.IO. orjson returns bytes
+    and takes no formatting kwargs (its output is already compact).
+    """
+
+    @staticmethod
+    def dumps(obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    @staticmethod
+    def loads(s, **kwargs):
+        return orjson.loads(s)
+
+
 # Issue #9: Explicit CORS configuration
 socketio = SocketIO(
     app,
     async_mode='gevent',
+    json=OrjsonJSON if orjson is not None else None,
     cors_allowed_origins=os.environ.get('CORS_ORIGINS', '*').split(',')
 )
 
@@ -41,13 +72,153 @@ socketio = SocketIO(
 # Constants (Issue #17: Named constants)
 # ============================================
 SAMPLE_RATE = 22050
+SAMPLE_DTYPE = np.int16  # Native mic format; half the memory of float32
+SAMPLE_SCALE = 1 / 32768  # int16 full scale to [-1, 1)
+MAX_CHANNELS = 2  # Stereo devices are averaged to mono rather than dropping a side
+# Frames per audio callback (~186 ms). The analyzer works in 500 ms ticks,
+# so larger blocks only cut callback overhead.
+BLOCK_SIZE = 4096
 BUFFER_SECONDS = 3
-BUFFER_SIZE = SAMPLE_RATE * BUFFER_SECONDS  # Pre-calculated buffer size
+# ~3 s ring; a power of two so running indices map to slots with a mask
+BUFFER_SIZE = 1 << 16
+BUFFER_MASK = BUFFER_SIZE - 1
 ANALYSIS_INTERVAL = 0.5  # Seconds between BPM analysis
+ANALYSIS_SAMPLES = int(SAMPLE_RATE * ANALYSIS_INTERVAL)  # New audio per analysis wakeup
+EMIT_HEARTBEAT = 5  # Seconds between repeats of an unchanged BPM update
 MIN_SAMPLES_FOR_ANALYSIS = SAMPLE_RATE * 2  # Need 2 seconds of audio
+MIN_NEW_SAMPLES = SAMPLE_RATE // 4  # Skip analysis ticks with less new audio
+SILENCE_POWER = 1e-6  # Mean square below this (-60 dBFS RMS) is treated as silence
+
+# Beat onsets live in the low end, so analysis runs at half the capture rate
+DECIMATION = 2
+ANALYSIS_SAMPLE_RATE = SAMPLE_RATE // DECIMATION
+# Same filter design as scipy.signal.decimate(ftype='fir'), applied with
+# carried state so chunk boundaries do not produce spurious onsets. The
+# int16 to float scaling is folded into the taps.
+DECIMATION_FILTER = (
+    scipy.signal.firwin(20 * DECIMATION + 1, 1 / DECIMATION) * SAMPLE_SCALE
+).astype(np.float32)
+
+# Onset envelope (~23 ms frames, as in librosa's beat tracker defaults)
+N_FFT = 1024
+HOP_LENGTH = 256  # In samples at ANALYSIS_SAMPLE_RATE
+ENVELOPE_FRAMES = SAMPLE_RATE * BUFFER_SECONDS // (HOP_LENGTH * DECIMATION)
+MIN_ENVELOPE_FRAMES = MIN_SAMPLES_FOR_ANALYSIS // (HOP_LENGTH * DECIMATION)
+ENVELOPE_RATE = ANALYSIS_SAMPLE_RATE / HOP_LENGTH  # Envelope frames per second
+# Tempo autocorrelation only needs the envelope's shape; half precision is plenty
+ENVELOPE_DTYPE = np.float16
+# Fixed STFT parameters, built once: librosa's periodic Hann window and
+# mel filterbank, so the per-tick path never goes through librosa
+STFT_WINDOW = scipy.signal.get_window('hann', N_FFT).astype(np.float32)
+MEL_BASIS = librosa.filters.mel(sr=ANALYSIS_SAMPLE_RATE, n_fft=N_FFT).T  # (bins, mels)
+POWER_FLOOR = 1e-10  # librosa.power_to_db amin
 
 TARGET_BPM = 180
 TOLERANCE = 5  # ±5 BPM
+# Constant part of every bpm_update payload, built once
+BPM_UPDATE_FIELDS = {'target': TARGET_BPM, 'tolerance': TOLERANCE}
+
+# Tempo search band: one octave around the target, preferred over its
+# half-tempo octave since a beat period also correlates at twice its lag
+MIN_BPM = 120
+MAX_BPM = 240
+MIN_LAG = int(60 * ENVELOPE_RATE / MAX_BPM)  # Envelope frames per beat
+MAX_LAG = int(np.ceil(60 * ENVELOPE_RATE / MIN_BPM))
+# Slower tempos are still searched, down to half of MIN_BPM, so a track
+# below the band is reported as such rather than folded into it
+SLOW_LAG = 2 * MAX_LAG
+# A slower peak must beat the in-band one by this factor to be reported
+OCTAVE_MARGIN = 2.0
+# Mean onset strength (dB of mel flux per frame) below which the input has no
+# beats to speak of: a steady tone sits near 0.1, music well above 1
+MIN_ONSET_STRENGTH = 0.5
+
+
+# ============================================
+# JIT Kernels
+# ============================================
+@numba.njit(cache=True)
+def _ring_write(buf, pos, samples):
+    """Copy samples into ring buffer at pos, wrapping around. Returns new pos."""
+    size = buf.size
+    n = samples.size
+    first = min(n, size - pos)
+    buf[pos:pos + first] = samples[:first]
+    if n > first:
+        buf[:n - first] = samples[first:]
+    return (pos + n) % size
+
+
+@numba.njit(cache=True, fastmath=True)
+def _spectral_flux(mel_db, prev, out):
+    """
+    Mean rectified increase of each mel frame over the one before it, as in
+    librosa.onset.onset_strength. prev is the frame preceding mel_db[0].
+    """
+    n_frames, n_mels = mel_db.shape
+    for t in range(n_frames):
+        ref = prev if t == 0 else mel_db[t - 1]
+        total = 0.0
+        for m in range(n_mels):
+            diff = mel_db[t, m] - ref[m]
+            if diff > 0:
+                total += diff
+        out[t] = total / n_mels
+    return out
+
+
+@numba.njit(cache=True, fastmath=True)
+def _band_autocorrelation(envelope, min_lag, max_lag):
+    """
+    Autocorrelation of the mean-removed envelope at lags min_lag..max_lag.
+    Every lag sums over the same number of frames.
+    """
+    mean = envelope.mean()
+    width = envelope.size - max_lag
+    ac = np.empty(max_lag - min_lag + 1, dtype=np.float32)
+    for i in range(ac.size):
+        lag = min_lag + i
+        total = 0.0
+        for t in range(width):
+            total += (envelope[t + lag] - mean) * (envelope[t] - mean)
+        ac[i] = total
+    return ac
+
+
+# ============================================
+# CPU Affinity
+# ============================================
+def _split_cpus():
+    """
+    Split the allowed CPUs into (audio, analysis) sets, or (None, None) if
+    affinity is unsupported (non-Linux) or only one CPU is available.
+    """
+    if not hasattr(os, 'sched_setaffinity'):
+        return None, None
+    cpus = sorted(os.sched_getaffinity(0))
+    if len(cpus) < 2:
+        return None, None
+    return {cpus[0]}, set(cpus[1:])
+
+
+# The PortAudio thread gets a core of its own, so the analyzer's FFT work
+# does not evict the ring buffer from its cache or migrate it between cores
+AUDIO_CPUS, ANALYSIS_CPUS = _split_cpus()
+
+
+def pin_current_thread(cpus):
+    """Restrict the calling OS thread to cpus and return its previous CPU set."""
+    if cpus is None:
+        return None
+    try:
+        # pid 0 is the calling thread, not the whole process
+        previous = os.sched_getaffinity(0)
+        os.sched_setaffinity(0, cpus)
+        return previous
+    except OSError as e:
+        logger.warning(f"Could not set CPU affinity: {e}")
+        return None
+
 
 # ============================================
 # Audio State Manager (Issue #2, #5, #6, #7, #12)
@@ -67,14 +238,49 @@ class AudioStateManager:
     def __init__(self):
         self._lock = RLock()  # Issue #6: Use gevent-compatible lock
         self._shutdown_event = Event()  # Issue #4: Graceful shutdown
+        # Set once ANALYSIS_SAMPLES new samples are buffered. The callback runs
+        # on a PortAudio thread, where gevent objects must not be touched, so
+        # it signals through a thread-safe async watcher that sets the event
+        # on the hub.
+        self._data_ready = Event()
+        self._data_notify = gevent.get_hub().loop.async_()
+        self._data_notify.start(self._data_ready.set)
+        self._last_notify = 0
         self._is_running = False
         self._audio_stream = None
         self._device_id = None
+        self._channels = 1
+        self._callback_pinned = False  # PortAudio thread moved to AUDIO_CPUS
 
         # Issue #7: Pre-allocated ring buffer instead of np.concatenate
-        self._buffer = np.zeros(BUFFER_SIZE, dtype=np.float32)
-        self._buffer_pos = 0
-        self._samples_received = 0
+        # Single-producer/single-consumer: the audio callback only advances
+        # _write_idx, the BPM monitor only advances _read_idx. Both are
+        # running sample counts, so neither side needs the lock.
+        self._buffer = np.zeros(BUFFER_SIZE, dtype=SAMPLE_DTYPE)
+        self._write_idx = 0
+        self._read_idx = 0
+        # Unwrapped copy of the ring handed to the analyzer. Reused on every
+        # call so the hot path does not allocate.
+        self._snapshot = np.empty(BUFFER_SIZE, dtype=SAMPLE_DTYPE)
+
+        # With rtmixer, the C callback records float32 into its own lock-free
+        # ring, which the BPM monitor drains into the ring above. start_stream
+        # allocates the drain buffers only in that mode.
+        self._capture_ring = None
+        self._capture_action = None
+        self._capture_frames = None
+        self._capture_samples = None
+
+        # Scratch space for the callback's stereo to mono downmix
+        self._mono_float = np.empty(BLOCK_SIZE, dtype=np.float32)
+        self._mono = np.empty(BLOCK_SIZE, dtype=SAMPLE_DTYPE)
+
+        # Last BPM update sent to clients, for duplicate suppression
+        self._last_emit = None
+        self._last_emit_time = 0.0
+
+        # Compile the ring writer now rather than inside the first audio callback
+        _ring_write(np.zeros(2, dtype=SAMPLE_DTYPE), 0, np.zeros(1, dtype=SAMPLE_DTYPE))
 
     @property
     def is_running(self):
@@ -99,63 +305,155 @@ class AudioStateManager:
 
     def request_shutdown(self):
         self._shutdown_event.set()
+        self._data_ready.set()  # Wake the monitor so it sees the shutdown
+
+    def wait_for_samples(self):
+        """Block the calling greenlet until new audio is ready for analysis."""
+        if rtmixer is None:
+            self._data_ready.wait()
+            self._data_ready.clear()
+            return
+
+        # The C callback cannot wake a greenlet, so poll its ring instead
+        self._shutdown_event.wait(timeout=ANALYSIS_INTERVAL)
+        if self._capture_ring is not None:
+            self._drain_capture()
+
+    def _drain_capture(self):
+        """Move samples recorded by the rtmixer C callback into the ring buffer."""
+        n = self._capture_ring.readinto(self._capture_frames)
+        if n and self._is_running:
+            frames = self._capture_frames[:n * self._channels].reshape(n, self._channels)
+            # Average the channels into the first one, in place
+            recorded = frames[:, 0]
+            if self._channels > 1:
+                for channel in range(1, self._channels):
+                    recorded += frames[:, channel]
+                recorded *= 1 / self._channels
+            # float32 [-1, 1] to SAMPLE_DTYPE full scale
+            np.clip(recorded, -1, 1, out=recorded)
+            np.multiply(
+                recorded, np.iinfo(SAMPLE_DTYPE).max,
+                out=self._capture_samples[:n], casting='unsafe'
+            )
+            self.add_samples(self._capture_samples[:n])
+
+        # rtmixer ends a recording once its ring fills up; start a new one
+        if self._capture_action not in self._audio_stream.actions:
+            self._capture_action = self._audio_stream.record_ringbuffer(self._capture_ring)
 
     def add_samples(self, samples):
-        """Add samples to ring buffer (thread-safe)."""
-        with self._lock:
-            n = len(samples)
-            if n >= BUFFER_SIZE:
-                # If more samples than buffer, keep only the last BUFFER_SIZE
-                self._buffer[:] = samples[-BUFFER_SIZE:]
-                self._buffer_pos = 0
-                self._samples_received = BUFFER_SIZE
-            else:
-                # Wrap around ring buffer
-                end_pos = self._buffer_pos + n
-                if end_pos <= BUFFER_SIZE:
-                    self._buffer[self._buffer_pos:end_pos] = samples
-                else:
-                    first_part = BUFFER_SIZE - self._buffer_pos
-                    self._buffer[self._buffer_pos:] = samples[:first_part]
-                    self._buffer[:n - first_part] = samples[first_part:]
-                self._buffer_pos = end_pos % BUFFER_SIZE
-                self._samples_received = min(self._samples_received + n, BUFFER_SIZE)
-
-    def get_buffer_copy(self):
-        """Get a copy of the current buffer for analysis."""
-        with self._lock:
-            if self._samples_received < MIN_SAMPLES_FOR_ANALYSIS:
-                return None
-            # Reconstruct buffer in correct order
-            if self._samples_received >= BUFFER_SIZE:
-                return np.concatenate([
-                    self._buffer[self._buffer_pos:],
-                    self._buffer[:self._buffer_pos]
-                ])
-            else:
-                return self._buffer[:self._samples_received].copy()
+        """Add samples to ring buffer (audio callback, or the rtmixer drain)."""
+        n = len(samples)
+        # If more samples than buffer, keep only the last BUFFER_SIZE
+        skip = max(0, n - BUFFER_SIZE)
+        write_idx = self._write_idx
+        _ring_write(self._buffer, (write_idx + skip) & BUFFER_MASK, samples[skip:])
+        self._write_idx = write_idx + n
+
+        # With rtmixer the monitor polls instead of waiting on _data_ready
+        if rtmixer is None and self._write_idx - self._last_notify >= ANALYSIS_SAMPLES:
+            self._last_notify = self._write_idx
+            self._data_notify.send()
+
+    def pending_samples(self):
+        """Number of samples received since the last get_new_samples()."""
+        return min(self._write_idx - self._read_idx, BUFFER_SIZE)
+
+    def get_new_samples(self):
+        """
+        Get the samples received since the previous call (BPM monitor only).
+
+        Returns (start, samples), where start is the running count of the
+        first returned sample. If the reader fell more than BUFFER_SIZE -
+        BLOCK_SIZE behind, only the newest samples are returned and start
+        jumps ahead.
+
+        Samples are unwrapped into a pre-allocated snapshot array, which is
+        overwritten by the next call. The callback only writes the ring, so
+        the snapshot is stable for the duration of one analysis.
+        """
+        write_idx = self._write_idx
+        start = max(self._read_idx, write_idx - BUFFER_SIZE)
+        n = write_idx - start
+
+        # Reconstruct samples in correct order
+        pos = start & BUFFER_MASK
+        first = min(n, BUFFER_SIZE - pos)
+        np.copyto(self._snapshot[:first], self._buffer[pos:pos + first])
+        np.copyto(self._snapshot[first:n], self._buffer[:n - first])
+        self._read_idx = write_idx
+
+        # Drop anything the callback overwrote while we were copying. The block
+        # being written is in the ring before _write_idx moves past it, so it
+        # counts as overwritten too.
+        lapped = max(0, self._write_idx + BLOCK_SIZE - BUFFER_SIZE - start)
+        return start + lapped, self._snapshot[lapped:n]
 
     def clear_buffer(self):
-        """Clear the audio buffer."""
-        with self._lock:
-            self._buffer.fill(0)
-            self._buffer_pos = 0
-            self._samples_received = 0
+        """Discard buffered audio by moving the read index up to the write index."""
+        self._read_idx = self._write_idx
+        # Send the first result after a restart even if it matches the last one
+        self._last_emit = None
+
+    def should_emit(self, update):
+        """
+        Check whether a BPM update should be sent: it differs from the last
+        one sent, or EMIT_HEARTBEAT seconds have passed since then.
+        """
+        now = get_time()
+        if update == self._last_emit and now - self._last_emit_time < EMIT_HEARTBEAT:
+            return False
+        self._last_emit = update
+        self._last_emit_time = now
+        return True
 
     def start_stream(self):
         """Start audio input stream."""
         with self._lock:
             if self._audio_stream is None or not self._audio_stream.active:
-                self._audio_stream = sd.InputStream(
-                    device=self._device_id,
-                    samplerate=SAMPLE_RATE,
-                    channels=1,
-                    dtype=np.float32,
-                    callback=self._audio_callback,
-                    blocksize=1024
+                device = sd.query_devices(self._device_id, 'input')
+                self._channels = max(1, min(MAX_CHANNELS, device['max_input_channels']))
+                if rtmixer is not None:
+                    self._audio_stream = rtmixer.Recorder(
+                        device=self._device_id,
+                        samplerate=SAMPLE_RATE,
+                        channels=self._channels,
+                        blocksize=BLOCK_SIZE
+                    )
+                    self._capture_frames = np.empty(
+                        BUFFER_SIZE * self._channels, dtype=np.float32
+                    )
+                    self._capture_samples = np.empty(BUFFER_SIZE, dtype=SAMPLE_DTYPE)
+                    self._capture_ring = rtmixer.RingBuffer(
+                        self._capture_frames.itemsize * self._channels, BUFFER_SIZE
+                    )
+                    # The C callback cannot pin itself. Where PortAudio creates
+                    # its thread in start() (ALSA), the thread inherits this
+                    # thread's affinity; other host APIs leave it unpinned.
+                    previous = pin_current_thread(AUDIO_CPUS)
+                    try:
+                        self._audio_stream.start()
+                    finally:
+                        pin_current_thread(previous)
+                    self._capture_action = self._audio_stream.record_ringbuffer(
+                        self._capture_ring
+                    )
+                else:
+                    self._callback_pinned = False
+                    self._audio_stream = sd.InputStream(
+                        device=self._device_id,
+                        samplerate=SAMPLE_RATE,
+                        channels=self._channels,
+                        dtype=SAMPLE_DTYPE,
+                        callback=self._audio_callback,
+                        blocksize=BLOCK_SIZE
+                    )
+                    self._audio_stream.start()
+                logger.info(
+                    f"Audio stream started (device: {self._device_id}, "
+                    f"channels: {self._channels})"
                 )
-                self._audio_stream.start()
-                logger.info(f"Audio stream started (device: {self._device_id})")
 
     def stop_stream(self):
         """Stop audio input stream."""
@@ -170,18 +468,33 @@ class AudioStateManager:
                     logger.error(f"Error stopping audio stream: {e}")
                 finally:
                     self._audio_stream = None
+                    self._capture_ring = None
+                    self._capture_action = None
+                    self._capture_frames = None
+                    self._capture_samples = None
                     logger.info("Audio stream stopped")
 
     def _audio_callback(self, indata, frames, time, status):
         """Callback for audio stream."""
+        if not self._callback_pinned:
+            pin_current_thread(AUDIO_CPUS)
+            self._callback_pinned = True
+
+        # The stream stays open between start/stop; only keep audio while running
+        if not self._is_running:
+            return
+
         if status:
             logger.warning(f"Audio status: {status}")
 
-        # Convert to mono if stereo
-        if len(indata.shape) > 1:
-            mono_data = indata[:, 0]
+        # Average stereo to mono: keeps transients from both sides and halves
+        # uncorrelated noise. float32 accumulation cannot overflow int16.
+        if indata.ndim > 1 and indata.shape[1] > 1:
+            np.mean(indata, axis=1, dtype=np.float32, out=self._mono_float[:frames])
+            mono_data = self._mono[:frames]
+            np.copyto(mono_data, self._mono_float[:frames], casting='unsafe')
         else:
-            mono_data = indata.flatten()
+            mono_data = indata.reshape(-1)
 
         self.add_samples(mono_data)
 
@@ -193,21 +506,171 @@ state = AudioStateManager()
 # ============================================
 # BPM Analysis
 # ============================================
+class OnsetEnvelope:
+    """
+    Onset strength envelope over the last BUFFER_SECONDS of audio.
+
+    Equivalent to librosa.onset.onset_strength (mel spectral flux), but
+    updated incrementally: the STFT overlap and the previous mel frame are
+    carried between updates, so each frame is only transformed once.
+    """
+
+    def __init__(self):
+        # Oldest to newest; the newest self._count entries are valid
+        self._values = np.zeros(ENVELOPE_FRAMES, dtype=ENVELOPE_DTYPE)
+        self.reset()
+
+        # Compile the analysis kernels now rather than on the first tick
+        frames = np.zeros((2, MEL_BASIS.shape[1]), dtype=np.float32)
+        _spectral_flux(frames, frames[0], np.empty(2, dtype=np.float32))
+        _band_autocorrelation(np.zeros(SLOW_LAG + 2, dtype=np.float32), 1, SLOW_LAG + 1)
+
+    def __len__(self):
+        return self._count
+
+    def reset(self):
+        self._count = 0
+        self._position = None  # Running count of the next expected sample
+        self._filter_state = np.zeros(len(DECIMATION_FILTER) - 1, dtype=np.float32)
+        self._carry = np.zeros(0, dtype=np.float32)  # Samples not yet in a full frame
+        self._prev_mel = None
+
+    def values(self):
+        return self._values[ENVELOPE_FRAMES - self._count:].astype(np.float32)
+
+    def update(self, start, samples):
+        """
+        Append envelope frames for samples starting at running count `start`.
+
+        Returns False if the new audio is silent. The envelope then restarts
+        empty, without computing an STFT: a window that is partly silence
+        biases the tempo autocorrelation toward long lags.
+        """
+        if start != self._position:
+            self.reset()
+        self._position = start + len(samples)
+
+        # Anti-alias, convert to float and keep every DECIMATION-th sample of
+        # the running stream. A float32 denominator keeps lfilter in single
+        # precision.
+        filtered, self._filter_state = scipy.signal.lfilter(
+            DECIMATION_FILTER, np.float32(1), samples, zi=self._filter_state
+        )
+        new = filtered[-start % DECIMATION::DECIMATION]
+        # Single dot product instead of np.mean(new ** 2) and its temporary
+        silent = np.dot(new, new) < SILENCE_POWER * len(new)
+
+        y = np.concatenate([self._carry, new])
+        n_frames = (len(y) - N_FFT) // HOP_LENGTH + 1
+        if n_frames <= 0:
+            self._carry = y
+            return not silent
+
+        if silent:
+            self._count = 0
+            self._prev_mel = None
+            self._carry = y[n_frames * HOP_LENGTH:]
+            return False
+
+        onset = self._onset_strength(y[:(n_frames - 1) * HOP_LENGTH + N_FFT])
+
+        # Shift the window left and append the new frames
+        n = min(n_frames, ENVELOPE_FRAMES)
+        self._values[:ENVELOPE_FRAMES - n] = self._values[n:]
+        self._values[ENVELOPE_FRAMES - n:] = onset[-n:]
+        self._count = min(self._count + n, ENVELOPE_FRAMES)
+        self._carry = y[n_frames * HOP_LENGTH:]
+        return True
+
+    def _onset_strength(self, y):
+        """Onset strength for each full frame of y, continuing from the last update."""
+        # Same result as librosa.feature.melspectrogram(center=False) followed
+        # by power_to_db(top_db=None), with the window and filterbank reused.
+        # scipy.fft keeps float32 in single precision.
+        frames = np.lib.stride_tricks.sliding_window_view(y, N_FFT)[::HOP_LENGTH]
+        spectrum = scipy.fft.rfft(frames * STFT_WINDOW, axis=1)
+        power = np.square(spectrum.real) + np.square(spectrum.imag)
+        mel_db = power @ MEL_BASIS
+        # Fixed dB reference so levels are comparable across updates
+        np.maximum(mel_db, POWER_FLOOR, out=mel_db)
+        np.log10(mel_db, out=mel_db)
+        mel_db *= 10
+
+        # The first frame after a reset has nothing to differ from, so it
+        # gets zero onset strength, like librosa's padding
+        prev = mel_db[0] if self._prev_mel is None else self._prev_mel
+        onset = _spectral_flux(mel_db, prev, np.empty(len(mel_db), dtype=np.float32))
+
+        self._prev_mel = mel_db[-1].copy()
+        return onset
+
+
+onset_envelope = OnsetEnvelope()
+
+
+def estimate_tempo(envelope):
+    """
+    Estimate tempo from the autocorrelation of the onset envelope.
+
+    Peaks (local maxima) of the autocorrelation are searched from MAX_BPM
+    down to half of MIN_BPM. The strongest in-band peak wins unless a
+    slower one is OCTAVE_MARGIN times stronger, and the chosen peak is
+    refined with parabolic interpolation since one lag step is ~12 BPM at
+    the target. Returns None if the envelope is too weak to hold beats or
+    there is no positively correlated peak.
+    """
+    # A steady tone's envelope is near flat, but its faint ripple still
+    # autocorrelates like a beat once the mean is removed
+    if envelope.mean() < MIN_ONSET_STRENGTH:
+        return None
+
+    # Only ~35 lags of a ~130 frame envelope are needed, so direct dot
+    # products beat a full-length FFT autocorrelation. ac[i] is lag
+    # MIN_LAG - 1 + i; the extra lag on each side is for peak detection.
+    ac = _band_autocorrelation(envelope, MIN_LAG - 1, SLOW_LAG + 1)
+
+    # inner[i] is lag MIN_LAG + i
+    prev_ac, inner, next_ac = ac[:-2], ac[1:-1], ac[2:]
+    curvature = prev_ac - 2 * inner + next_ac
+    is_peak = (inner >= prev_ac) & (inner >= next_ac) & (curvature < 0)
+    # Compare peaks by their interpolated height, since a period between two
+    # lags splits its correlation across both
+    with np.errstate(divide='ignore', invalid='ignore'):
+        height = inner - 0.125 * (prev_ac - next_ac) ** 2 / curvature
+    strength = np.where(is_peak, height, -np.inf)
+
+    split = MAX_LAG - MIN_LAG + 1
+    peak = int(np.argmax(strength[:split]))
+    slow_peak = split + int(np.argmax(strength[split:]))
+    if strength[slow_peak] > OCTAVE_MARGIN * max(strength[peak], 0):
+        peak = slow_peak
+    if not strength[peak] > 0:
+        return None
+
+    # At a local maximum the vertex stays within half a lag of the peak
+    lag = MIN_LAG + peak + 0.5 * (prev_ac[peak] - next_ac[peak]) / curvature[peak]
+    return 60 * ENVELOPE_RATE / lag
+
+
 def analyze_bpm():
-    """Analyze the audio buffer and detect BPM."""
-    data = state.get_buffer_copy()
-    if data is None:
+    """Analyze newly received audio and detect BPM."""
+    # Too little new audio to move the estimate; nothing new to report
+    if state.pending_samples() < MIN_NEW_SAMPLES:
         return None, False
 
-    try:
-        tempo, _ = librosa.beat.beat_track(y=data, sr=SAMPLE_RATE)
-
-        # Issue #13: Handle librosa version differences
-        if isinstance(tempo, np.ndarray):
-            tempo = float(tempo[0]) if len(tempo) > 0 else 0.0
-        else:
-            tempo = float(tempo)
+    start, samples = state.get_new_samples()
 
+    try:
+        # Silent input: report 0 BPM so clients stop showing the last tempo
+        if not onset_envelope.update(start, samples):
+            return 0.0, False
+        if len(onset_envelope) < MIN_ENVELOPE_FRAMES:
+            return None, False
+
+        tempo = estimate_tempo(onset_envelope.values())
+        if tempo is None:
+            return None, False
+        tempo = float(tempo)
         is_target_bpm = abs(tempo - TARGET_BPM) <= TOLERANCE
         return round(tempo, 1), is_target_bpm
 
@@ -222,17 +685,18 @@ def bpm_monitor():
 
     # Issue #4: Check shutdown event instead of infinite loop
     while not state.should_shutdown():
+        # Sleep until the callback has buffered ANALYSIS_INTERVAL of new audio,
+        # so there are no wakeups at all while stopped
+        state.wait_for_samples()
         if state.is_running:
             bpm, is_180 = analyze_bpm()
-            if bpm is not None:
+            # Clients display whole BPM, so only a change there is news
+            if bpm is not None and state.should_emit((round(bpm), is_180)):
                 socketio.emit('bpm_update', {
                     'bpm': bpm,
                     'is_180': is_180,
-                    'target': TARGET_BPM,
-                    'tolerance': TOLERANCE
+                    **BPM_UPDATE_FIELDS
                 })
-        # Issue #24: Use event wait with timeout for efficient polling
-        state._shutdown_event.wait(timeout=ANALYSIS_INTERVAL)
 
     logger.info("BPM monitor stopped")
 
@@ -302,6 +766,8 @@ def handle_start():
 
     try:
         state.clear_buffer()
+        onset_envelope.reset()
+        # Normally already open since startup; opens it on first use otherwise
         state.start_stream()
         state.is_running = True
 
@@ -321,8 +787,8 @@ def handle_stop():
     """Handle stop event from client."""
     logger.info('Stop request received')
 
+    # Leave the stream open so the next start has no device warm-up delay
     state.is_running = False
-    state.stop_stream()
     state.clear_buffer()
 
     # Issue #14: Send confirmation to client
@@ -363,6 +829,15 @@ if __name__ == '__main__':
 
     state.device_id = found_device_id
     print(f"Using input device: [{found_device_id}] {device_name}")
+
+    # Keep the gevent hub and the analyzer off the audio thread's core
+    pin_current_thread(ANALYSIS_CPUS)
+
+    # Open the stream once for the process lifetime; start/stop only gate it
+    try:
+        state.start_stream()
+    except Exception as e:
+        logger.error(f"Error starting audio stream: {e}")
     print("Open http://localhost:8080 in your browser")
     print("Click 'Start' to begin BPM detection")
 